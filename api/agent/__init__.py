@@ -6,7 +6,7 @@ import json
 import azure.functions as func
 
 from ..config import settings
-from ..utils import logger
+from ..utils import logger, Deadline
 from ..services import vision_service, search_service, openai_service
 
 
@@ -18,6 +18,12 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     busca contexto relevante en la base de conocimiento,
     y genera respuestas usando GPT.
     """
+    # Presupuesto de tiempo compartido por todas las llamadas del request;
+    # cada etapa usa uno recortado para dejar tiempo a las siguientes
+    deadline = Deadline(settings.deadline.request_seconds)
+    stage_deadline = deadline.reserve(settings.deadline.gpt_reserve_seconds)
+    ocr_deadline = stage_deadline.reserve(settings.deadline.search_reserve_seconds)
+    
     try:
         logger.section("INICIO REQUEST")
         
@@ -42,20 +48,34 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         # Procesar imagen si existe
         ocr_text = None
         if image_base64:
-            ocr_text = vision_service.extract_text(image_base64)
+            ocr_text = vision_service.extract_text(image_base64, deadline=ocr_deadline)
             if ocr_text:
                 message = f"[Imagen adjunta]\n{ocr_text}\n\nPregunta: {message}"
         
+        # Contexto estable para el prefijo del prompt (solo en ese modo)
+        stable_prefix = settings.openai.stable_prompt_prefix and settings.search.is_configured
+        static_context = None
+        if stable_prefix:
+            static_context = search_service.get_static_context(stage_deadline)
+        
         # Buscar en base de conocimiento (RAG)
         context_from_kb = ""
         used_rag = False
         
         if settings.search.is_configured:
-            context_from_kb = search_service.search(message)
-            used_rag = bool(context_from_kb)
+            if static_context and search_service.is_generic_query(message):
+                # El prefijo ya contiene los documentos genericos: no gastar una consulta
+                logger.info("Consulta generica resuelta con el contexto estatico")
+            else:
+                context_from_kb = search_service.search(
+                    message,
+                    deadline=stage_deadline,
+                    exclude_static=bool(static_context)
+                )
+            used_rag = bool(context_from_kb or static_context)
             
             if used_rag:
-                logger.success(f"RAG ACTIVADO - {len(context_from_kb)} chars de contexto")
+                logger.success(f"RAG ACTIVADO - {len(context_from_kb or static_context)} chars de contexto")
             else:
                 logger.warn("RAG NO ACTIVADO - Sin contexto recuperado")
         else:
@@ -65,7 +85,9 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         gpt_response = openai_service.chat(
             message=message,
             history=history,
-            knowledge_context=context_from_kb
+            knowledge_context=context_from_kb,
+            static_context=static_context,
+            deadline=deadline
         )
         
         # Construir respuesta
@@ -82,7 +104,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             ]
         }
         
-        logger.success("REQUEST COMPLETADO")
+        logger.success(f"REQUEST COMPLETADO (tiempo restante: {deadline.remaining:.1f}s)")
         
         return func.HttpResponse(
             json.dumps(response_data, ensure_ascii=False),
@@ -0,0 +1 @@
+"""Benchmarks de rendimiento del agente (no se despliegan como funciones)."""
@@ -0,0 +1,133 @@
+"""
+Benchmark del cache de prompt de Azure OpenAI.
+Compara latencia, tokens cacheados y coste entre el layout clasico de
+mensajes y el layout con prefijo estable (OPENAI_STABLE_PREFIX).
+
+Uso (desde la raiz del repo, con las variables de entorno cargadas):
+    python -m api.benchmarks.prompt_cache --rounds 3
+
+Nota: Azure solo cachea prompts de 1024 tokens o mas, por lo que el
+prefijo estable necesita el contexto generico para beneficiarse.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from ..services import search_service, openai_service
+
+
+QUESTIONS = [
+    "¿Qué certificaciones tiene Federico?",
+    "¿Tiene alguna certificación de Azure?",
+    "¿Dónde estudió Federico?",
+    "¿Qué cursos de programación ha realizado?",
+]
+
+
+def _measure(stable: bool, question: str, context: str, static_context: str) -> dict:
+    """Ejecuta una pregunta en un modo y devuelve la medicion"""
+    openai_service.config.stable_prompt_prefix = stable
+    start = time.perf_counter()
+    openai_service.chat(
+        message=question,
+        knowledge_context=context,
+        static_context=static_context if stable else None
+    )
+    elapsed = time.perf_counter() - start
+
+    usage = openai_service.last_usage
+    details = usage.get('prompt_tokens_details') or {}
+    return {
+        'latency': elapsed,
+        'prompt_tokens': usage.get('prompt_tokens', 0),
+        'cached_tokens': details.get('cached_tokens', 0),
+        'completion_tokens': usage.get('completion_tokens', 0),
+    }
+
+
+def _run(contexts: Dict[bool, Dict[str, str]], static_context: str, rounds: int) -> Dict[bool, List[dict]]:
+    """
+    Ejecuta ambos modos intercalados: cada pregunta se mide en los dos
+    modos seguidos, alternando cual va primero, para que el orden y el
+    calentamiento no favorezcan a ninguno.
+    """
+    samples = {False: [], True: []}
+    original = openai_service.config.stable_prompt_prefix
+
+    try:
+        for round_index in range(rounds):
+            for question_index, question in enumerate(QUESTIONS):
+                first = (round_index + question_index) % 2 == 0
+                for stable in (first, not first):
+                    samples[stable].append(
+                        _measure(stable, question, contexts[stable][question], static_context)
+                    )
+    finally:
+        openai_service.config.stable_prompt_prefix = original
+
+    return samples
+
+
+def _cost(sample: dict, args) -> float:
+    """Coste en USD de una llamada segun los precios por millon de tokens"""
+    uncached = sample['prompt_tokens'] - sample['cached_tokens']
+    return (
+        uncached * args.input_price
+        + sample['cached_tokens'] * args.cached_price
+        + sample['completion_tokens'] * args.output_price
+    ) / 1_000_000
+
+
+def _summary(name: str, samples: List[dict], args):
+    """Imprime el resumen de un modo"""
+    latencies = sorted(s['latency'] for s in samples)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    prompt = sum(s['prompt_tokens'] for s in samples)
+    cached = sum(s['cached_tokens'] for s in samples)
+    cost = sum(_cost(s, args) for s in samples)
+
+    print(f"\n[{name}]")
+    print(f"  Llamadas: {len(samples)}")
+    print(f"  Latencia media: {statistics.mean(latencies):.2f}s  p95: {p95:.2f}s")
+    print(f"  Tokens prompt: {prompt}  cacheados: {cached} ({(cached / prompt * 100) if prompt else 0:.1f}%)")
+    print(f"  Coste estimado: ${cost:.5f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=3, help="Repeticiones de cada pregunta")
+    parser.add_argument('--input-price', type=float, default=0.40, help="USD por 1M tokens de entrada")
+    parser.add_argument('--cached-price', type=float, default=0.10, help="USD por 1M tokens cacheados")
+    parser.add_argument('--output-price', type=float, default=1.60, help="USD por 1M tokens de salida")
+    args = parser.parse_args()
+
+    # Las busquedas se hacen una sola vez para no gastar cuota de Azure Search
+    static_context = search_service.get_static_context()
+
+    # Mismo contexto variable que arma `agent.main` en cada modo: en el de
+    # prefijo estable las genericas no buscan y se omiten los docs del prefijo
+    contexts = {
+        False: {question: search_service.search(question) for question in QUESTIONS},
+        True: {
+            question: ""
+            if static_context and search_service.is_generic_query(question)
+            else search_service.search(question, exclude_static=bool(static_context))
+            for question in QUESTIONS
+        },
+    }
+
+    samples = _run(contexts, static_context, args.rounds)
+
+    _summary("LAYOUT CLASICO", samples[False], args)
+    _summary("PREFIJO ESTABLE", samples[True], args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
-from .settings import settings, Settings, VisionConfig, OpenAIConfig, SearchConfig
+from .settings import settings, Settings, VisionConfig, OpenAIConfig, SearchConfig, RerankConfig, DeadlineConfig, ServerConfig
 
-__all__ = ['settings', 'Settings', 'VisionConfig', 'OpenAIConfig', 'SearchConfig']
+__all__ = ['settings', 'Settings', 'VisionConfig', 'OpenAIConfig', 'SearchConfig',
+           'RerankConfig', 'DeadlineConfig', 'ServerConfig']
@@ -7,6 +7,14 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Lee una variable de entorno booleana (1/true/yes/on)"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 @dataclass
 class VisionConfig:
     """Configuracion de Azure Computer Vision"""
@@ -25,6 +33,7 @@ class OpenAIConfig:
     endpoint: Optional[str]
     deployment_name: str = "gpt-4.1-mini"
     api_version: str = "2024-08-01-preview"
+    stable_prompt_prefix: bool = False
     
     @property
     def is_configured(self) -> bool:
@@ -45,12 +54,59 @@ class SearchConfig:
     endpoint: Optional[str]
     key: Optional[str]
     index_name: str = "certificado-federico"
+    document_cache_ttl: float = 600.0
     
     @property
     def is_configured(self) -> bool:
         return bool(self.endpoint and self.key)
 
 
+@dataclass
+class RerankConfig:
+    """Reranking y deduplicacion local de resultados de busqueda"""
+    enabled: bool = True
+    similarity_threshold: float = 0.8
+    max_chunks_per_title: int = 2
+    score_threshold: float = 0.35
+    key_phrases_boost: float = 0.5
+    organizations_boost: float = 0.3
+    title_boost: float = 0.3
+
+
+@dataclass
+class DeadlineConfig:
+    """Presupuesto de tiempo por request y peticiones hedged"""
+    request_seconds: float = 120.0
+    gpt_reserve_seconds: float = 45.0
+    search_reserve_seconds: float = 15.0
+    hedge_search: bool = False
+    hedge_ocr_poll: bool = False
+    hedge_default_delay: float = 2.0
+    hedge_min_delay: float = 0.2
+    reserves_clamped: bool = False
+    
+    def __post_init__(self):
+        # Si las reservas no dejan tiempo para OCR/Search, se reducen
+        # proporcionalmente a la mitad del deadline en vez de dar
+        # deadlines negativos que cancelan esas etapas en cada request
+        reserved = self.gpt_reserve_seconds + self.search_reserve_seconds
+        if reserved >= self.request_seconds:
+            scale = (self.request_seconds / 2) / reserved if reserved > 0 else 0
+            self.gpt_reserve_seconds *= scale
+            self.search_reserve_seconds *= scale
+            self.reserves_clamped = True
+
+
+@dataclass
+class ServerConfig:
+    """Configuracion del servidor local (fuera de Azure Functions)"""
+    host: str = "127.0.0.1"
+    port: int = 7071
+    workers: int = 1
+    graceful_timeout: int = 60
+    prefetch_generic: bool = False
+
+
 class Settings:
     """Configuracion global de la aplicacion"""
     
@@ -62,13 +118,40 @@ class Settings:
         
         self.openai = OpenAIConfig(
             key=os.environ.get("OPENAI_KEY"),
-            endpoint=os.environ.get("OPENAI_ENDPOINT")
+            endpoint=os.environ.get("OPENAI_ENDPOINT"),
+            stable_prompt_prefix=_env_flag("OPENAI_STABLE_PREFIX")
         )
         
         self.search = SearchConfig(
             endpoint=os.environ.get("SEARCH_ENDPOINT"),
             key=os.environ.get("SEARCH_ADMIN_KEY"),
-            index_name=os.environ.get("SEARCH_INDEX_NAME", "certificado-federico")
+            index_name=os.environ.get("SEARCH_INDEX_NAME", "certificado-federico"),
+            document_cache_ttl=float(os.environ.get("SEARCH_DOCUMENT_CACHE_TTL", "600"))
+        )
+        
+        self.rerank = RerankConfig(
+            enabled=_env_flag("RERANK_ENABLED", default=True),
+            similarity_threshold=float(os.environ.get("RERANK_SIMILARITY_THRESHOLD", "0.8")),
+            max_chunks_per_title=int(os.environ.get("RERANK_MAX_CHUNKS_PER_TITLE", "2")),
+            score_threshold=float(os.environ.get("RERANK_SCORE_THRESHOLD", "0.35"))
+        )
+        
+        self.deadline = DeadlineConfig(
+            request_seconds=float(os.environ.get("REQUEST_DEADLINE_SECONDS", "120")),
+            gpt_reserve_seconds=float(os.environ.get("GPT_RESERVE_SECONDS", "45")),
+            search_reserve_seconds=float(os.environ.get("SEARCH_RESERVE_SECONDS", "15")),
+            hedge_search=_env_flag("HEDGE_SEARCH"),
+            hedge_ocr_poll=_env_flag("HEDGE_OCR_POLL"),
+            hedge_default_delay=float(os.environ.get("HEDGE_DEFAULT_DELAY", "2.0")),
+            hedge_min_delay=float(os.environ.get("HEDGE_MIN_DELAY", "0.2"))
+        )
+        
+        self.server = ServerConfig(
+            host=os.environ.get("SERVER_HOST", "127.0.0.1"),
+            port=int(os.environ.get("SERVER_PORT", "7071")),
+            workers=int(os.environ.get("SERVER_WORKERS", "1")),
+            graceful_timeout=int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "60")),
+            prefetch_generic=_env_flag("SERVER_PREFETCH_GENERIC")
         )
     
     def validate_required(self) -> tuple[bool, list[str]]:
@@ -93,9 +176,18 @@ class Settings:
         logger.info(f"  VISION_ENDPOINT: {self.vision.endpoint or '[X] MISSING'}")
         logger.info(f"  OPENAI_KEY: {'[OK]' if self.openai.key else '[X] MISSING'}")
         logger.info(f"  OPENAI_ENDPOINT: {self.openai.endpoint or '[X] MISSING'}")
+        logger.info(f"  OPENAI_STABLE_PREFIX: {self.openai.stable_prompt_prefix}")
         logger.info(f"  SEARCH_ENDPOINT: {self.search.endpoint or '[X] MISSING'}")
         logger.info(f"  SEARCH_KEY: {'[OK]' if self.search.key else '[X] MISSING'}")
         logger.info(f"  SEARCH_INDEX: {self.search.index_name}")
+        logger.info(f"  RERANK: {'[ON]' if self.rerank.enabled else '[OFF]'}")
+        logger.info(f"  REQUEST_DEADLINE: {self.deadline.request_seconds}s (reserva GPT: {self.deadline.gpt_reserve_seconds}s, Search: {self.deadline.search_reserve_seconds}s)")
+        if self.deadline.reserves_clamped:
+            logger.warn(
+                "  GPT_RESERVE_SECONDS + SEARCH_RESERVE_SECONDS >= REQUEST_DEADLINE_SECONDS: "
+                "reservas reducidas a la mitad del deadline"
+            )
+        logger.info(f"  HEDGE_SEARCH: {self.deadline.hedge_search} / HEDGE_OCR_POLL: {self.deadline.hedge_ocr_poll}")
 
 
 # Singleton de configuracion
@@ -0,0 +1,133 @@
+"""
+Servidor local (ASGI) para ejecutar el agente fuera de Azure Functions.
+Adapta el mismo handler de `agent.main` y sirve el frontend de `static/`.
+
+Uso (desde la raiz del repo):
+    python -m api.server --workers 4
+
+Con `--workers N` uvicorn arranca N procesos con multiprocessing "spawn"
+(cada uno importa la app de cero; funciona tambien en Windows). Para un
+modo pre-fork real en Linux/macOS se usa gunicorn con el worker de uvicorn:
+    gunicorn api.server:app -k uvicorn.workers.UvicornWorker -w 4 \
+        -b 127.0.0.1:7071 --graceful-timeout 60
+
+Cada worker prepara sus clientes y caches antes de aceptar trafico.
+Al recibir SIGINT/SIGTERM se deja de aceptar conexiones y se esperan
+las respuestas en curso hasta `graceful_timeout` segundos; las que no
+terminen en ese plazo se cortan.
+"""
+import argparse
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import azure.functions as func
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+from .config import settings
+from .utils import logger
+from .services import vision_service, search_service, openai_service
+from .agent import main as agent_main
+
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+
+
+def _to_function_request(request: Request, body: bytes) -> func.HttpRequest:
+    """Convierte una peticion ASGI en la peticion que espera Azure Functions"""
+    return func.HttpRequest(
+        method=request.method,
+        url=str(request.url),
+        headers=dict(request.headers),
+        params=dict(request.query_params),
+        route_params=dict(request.path_params),
+        body=body
+    )
+
+
+def _to_asgi_response(response: func.HttpResponse) -> Response:
+    """Convierte la respuesta de Azure Functions en una respuesta ASGI"""
+    headers = {
+        key: value for key, value in response.headers.items()
+        if key.lower() != 'content-type'
+    }
+    media_type = response.mimetype
+    if media_type and response.charset:
+        media_type = f"{media_type}; charset={response.charset}"
+
+    return Response(
+        content=response.get_body(),
+        status_code=response.status_code,
+        headers=headers,
+        media_type=media_type
+    )
+
+
+async def agent_endpoint(request: Request) -> Response:
+    """Endpoint /api/agent (mismo contrato que la Azure Function)"""
+    body = await request.body()
+    # El handler es sincrono (requests, SDK de Azure): se ejecuta en el threadpool
+    response = await run_in_threadpool(agent_main, _to_function_request(request, body))
+    return _to_asgi_response(response)
+
+
+def warm_up():
+    """Inicializa clientes y caches del worker antes de aceptar trafico"""
+    logger.section("WARM-UP DEL WORKER")
+    settings.print_status(logger)
+
+    vision_service.warm_up()
+    openai_service.warm_up()
+    search_service.warm_up(prefetch_generic=settings.server.prefetch_generic)
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    await run_in_threadpool(warm_up)
+    logger.success("Worker listo para recibir trafico")
+    yield
+    logger.info("Worker detenido")
+
+
+app = Starlette(
+    routes=[
+        Route("/api/agent", agent_endpoint, methods=["POST"]),
+        Mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="static"),
+    ],
+    lifespan=lifespan
+)
+
+
+def main():
+    import uvicorn
+
+    config = settings.server
+
+    parser = argparse.ArgumentParser(description="Servidor local del agente RAG")
+    parser.add_argument('--host', default=config.host)
+    parser.add_argument('--port', type=int, default=config.port)
+    parser.add_argument('--workers', type=int, default=config.workers,
+                        help="Numero de procesos (1 = un solo proceso)")
+    parser.add_argument('--graceful-timeout', type=int, default=config.graceful_timeout,
+                        help="Segundos de espera para respuestas en curso al apagar")
+    args = parser.parse_args()
+
+    logger.info(f"Sirviendo en http://{args.host}:{args.port} con {args.workers} worker(s)")
+
+    # Con varios workers uvicorn necesita la app como import string
+    # (los procesos se crean con "spawn"; para pre-fork ver gunicorn arriba)
+    uvicorn.run(
+        "api.server:app" if args.workers > 1 else app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,13 @@
 from .vision_service import vision_service, VisionService
 from .search_service import search_service, SearchService
 from .openai_service import openai_service, OpenAIService
+from .document_store import DocumentStore, FormattedDocument
+from .reranker import reranker, Reranker
 
 __all__ = [
     'vision_service', 'VisionService',
     'search_service', 'SearchService', 
-    'openai_service', 'OpenAIService'
+    'openai_service', 'OpenAIService',
+    'DocumentStore', 'FormattedDocument',
+    'reranker', 'Reranker'
 ]
@@ -0,0 +1,139 @@
+"""
+Almacen de documentos preformateados.
+Guarda el bloque de contexto de cada documento ya construido, indexado
+por ID y version, para no reformatearlo en cada request.
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class FormattedDocument:
+    """Bloque de contexto ya formateado de un documento"""
+
+    __slots__ = ('doc_id', 'version', 'block', 'expires_at')
+
+    def __init__(self, doc_id: Optional[str], version: Optional[str], block: str, expires_at: float = 0.0):
+        self.doc_id = doc_id
+        self.version = version
+        self.block = block
+        self.expires_at = expires_at
+
+
+class DocumentStore:
+    """
+    Cache de bloques formateados indexada por (ID de documento, version).
+
+    Los documentos del indice cambian muy poco, asi que cada bloque
+    se construye una sola vez. En cada request solo se leen el ID y la
+    version del resultado y se unen los bloques ya construidos.
+
+    Si el indice expone una fecha de modificacion se usa como version.
+    Si no, cada bloque caduca a los `ttl` segundos y se reconstruye, asi
+    los cambios del indice (p.ej. un chunk con texto nuevo) se ven como
+    mucho tras ese plazo.
+
+    Si el indice no expone un campo de ID (o el documento no tiene
+    titulo), el bloque se formatea en cada request como antes: sin ID
+    no hay forma barata de saber si el documento ya esta en cache.
+    """
+
+    # Campos que pueden actuar como ID del documento (en orden de preferencia)
+    ID_FIELDS = ('chunk_id', 'id', 'metadata_storage_path')
+
+    # Campos que cambian cuando el documento se reindexa
+    VERSION_FIELDS = ('metadata_storage_last_modified', 'metadata_last_modified')
+
+    MAX_CONTENT_CHARS = 1200
+    MAX_KEY_PHRASES = 7
+    MIN_CONTENT_CHARS = 20
+    MAX_ENTRIES = 512
+    DEFAULT_TTL = 600
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.ttl = self.DEFAULT_TTL if ttl is None else ttl
+        self._entries: Dict[Tuple[str, Optional[str]], FormattedDocument] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _doc_id(self, result: dict) -> Optional[str]:
+        """ID del documento en el indice (None si el indice no lo expone)"""
+        for field in self.ID_FIELDS:
+            value = result.get(field)
+            if value:
+                return value
+        return None
+
+    def _version(self, result: dict) -> Optional[str]:
+        """Version del documento (fecha de ultima modificacion, si existe)"""
+        for field in self.VERSION_FIELDS:
+            value = result.get(field)
+            if value:
+                return str(value)
+        return None
+
+    def _build_block(self, result: dict, index: int) -> str:
+        """Construye el bloque de contexto de un documento"""
+        content = result.get('chunk', '')
+        title = result.get('title', f'doc_{index}')
+        persons = result.get('persons', [])
+        organizations = result.get('organizations', [])
+        locations = result.get('locations', [])
+        key_phrases = result.get('keyPhrases', [])
+
+        parts = [f"[DOC: {title}]\n\n"]
+
+        if persons:
+            parts.append(f"Personas: {', '.join(persons)}\n")
+        if organizations:
+            parts.append(f"Organizaciones: {', '.join(organizations)}\n")
+        if locations:
+            parts.append(f"Ubicaciones: {', '.join(locations)}\n")
+        if key_phrases:
+            parts.append(f"Palabras clave: {', '.join(key_phrases[:self.MAX_KEY_PHRASES])}\n")
+
+        parts.append(f"\n{content[:self.MAX_CONTENT_CHARS]}")
+
+        return ''.join(parts)
+
+    def get(self, result: dict, index: int) -> Optional[FormattedDocument]:
+        """
+        Devuelve el bloque formateado de un resultado de busqueda.
+
+        Args:
+            result: Documento devuelto por Azure Search
+            index: Posicion del documento en los resultados (1-based)
+
+        Returns:
+            Documento formateado o None si el contenido es insuficiente
+        """
+        content = result.get('chunk', '')
+        if not content or len(content) <= self.MIN_CONTENT_CHARS:
+            return None
+
+        doc_id = self._doc_id(result)
+        if doc_id is None or 'title' not in result:
+            # Sin ID (o con titulo 'doc_N' dependiente de la posicion) no se cachea
+            return FormattedDocument(doc_id, None, self._build_block(result, index))
+
+        key = (doc_id, self._version(result))
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is None or entry.expires_at <= now:
+            entry = FormattedDocument(key[0], key[1], self._build_block(result, index), now + self.ttl)
+            with self._lock:
+                if key not in self._entries and len(self._entries) >= self.max_entries:
+                    # Descartar la entrada mas antigua (orden de insercion)
+                    self._entries.pop(next(iter(self._entries), None), None)
+                self._entries[key] = entry
+
+        return entry
+
+    @staticmethod
+    def join(entries: Iterable[FormattedDocument], separator: str) -> str:
+        """Une bloques ya construidos en un unico contexto"""
+        return separator.join([entry.block for entry in entries])
@@ -6,7 +6,7 @@ from typing import List, Dict, Optional
 import requests
 
 from ..config import settings
-from ..utils import logger
+from ..utils import logger, Deadline, DeadlineExceeded
 
 
 class OpenAIService:
@@ -30,14 +30,65 @@ PROHIBIDO:
 
 Responde en español de forma profesional pero honesta."""
     
+    # Contexto RAG inyectado como mensaje de sistema
+    KB_TEMPLATE = """INFORMACIÓN OFICIAL DE FEDERICO ZOPPI:
+
+{context}
+
+---
+IMPORTANTE: Esta es la ÚNICA información que puedes usar. NO menciones nada que no esté aquí explícitamente.
+Si la respuesta no está en el texto de arriba, di que no tienes esa información."""
+    
+    # Mensaje cuando no hay contexto RAG disponible
+    FALLBACK_MESSAGE = """IMPORTANTE: No tienes acceso a la base de conocimiento en este momento.
+
+Cuando te pregunten sobre certificaciones, experiencia o información de Federico Zoppi, responde:
+
+"Lo siento, he superado el límite diario de consultas a mi base de conocimiento (Azure AI Search tiene un límite de ~100 consultas/día en el plan gratuito). 
+
+Puedes:
+1. Intentar nuevamente en unas horas o mañana
+2. Descargar mi CV directamente desde el botón de descarga
+3. Preguntarme sobre otras funciones del asistente (OCR de imágenes, preguntas generales)
+
+¡Gracias por tu comprensión!"
+
+Para cualquier otra pregunta que no sea sobre información personal de Federico, puedes responder normalmente."""
+    
     # Configuracion de la llamada
     DEFAULT_MAX_TOKENS = 1000
     DEFAULT_TEMPERATURE = 0.3  # Baja para adherirse a hechos (era 0.7)
     DEFAULT_TIMEOUT = 60
+    WARM_UP_TIMEOUT = 5
     MAX_HISTORY_MESSAGES = 10
     
     def __init__(self):
         self.config = settings.openai
+        self.last_usage: Dict = {}
+        self._session: Optional[requests.Session] = None
+    
+    @property
+    def session(self) -> requests.Session:
+        """Sesion HTTP reutilizable (mantiene las conexiones abiertas)"""
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+    
+    def warm_up(self):
+        """
+        Abre la conexion TLS del pool antes de recibir trafico.
+        
+        Un HEAD sin credenciales basta: la respuesta (401/404) no importa,
+        la conexion queda abierta en la sesion para el primer request real.
+        """
+        if not self.config.is_configured:
+            return
+        
+        try:
+            self.session.head(self.config.chat_url, timeout=self.WARM_UP_TIMEOUT)
+            logger.success("OpenAI Service listo (conexion abierta)")
+        except requests.exceptions.RequestException as e:
+            logger.warn(f"Warm-up de OpenAI fallido: {str(e)}")
     
     def _get_headers(self) -> dict:
         """Headers para las peticiones a Azure OpenAI"""
@@ -50,7 +101,8 @@ Responde en español de forma profesional pero honesta."""
         self,
         user_message: str,
         history: List[Dict],
-        knowledge_context: Optional[str] = None
+        knowledge_context: Optional[str] = None,
+        static_context: Optional[str] = None
     ) -> List[Dict]:
         """
         Construye el array de mensajes para la API.
@@ -59,38 +111,22 @@ Responde en español de forma profesional pero honesta."""
             user_message: Mensaje actual del usuario
             history: Historial de conversacion
             knowledge_context: Contexto de RAG (opcional)
+            static_context: Contexto generico estable para el prefijo (opcional)
         """
+        if self.config.stable_prompt_prefix:
+            return self._build_stable_messages(user_message, history, knowledge_context, static_context)
+        
         messages = [{"role": "system", "content": self.SYSTEM_PROMPT}]
         
         # Agregar contexto RAG si existe
         if knowledge_context:
-            kb_message = f"""INFORMACIÓN OFICIAL DE FEDERICO ZOPPI:
-
-{knowledge_context}
-
----
-IMPORTANTE: Esta es la ÚNICA información que puedes usar. NO menciones nada que no esté aquí explícitamente.
-Si la respuesta no está en el texto de arriba, di que no tienes esa información."""
+            kb_message = self.KB_TEMPLATE.format(context=knowledge_context)
             messages.append({"role": "system", "content": kb_message})
             logger.success(f"Contexto RAG inyectado: {len(knowledge_context)} chars")
         else:
             # Sin contexto RAG - probablemente límite de consultas excedido
             logger.warn("Sin contexto RAG - límite de consultas posiblemente excedido")
-            fallback_message = """IMPORTANTE: No tienes acceso a la base de conocimiento en este momento.
-
-Cuando te pregunten sobre certificaciones, experiencia o información de Federico Zoppi, responde:
-
-"Lo siento, he superado el límite diario de consultas a mi base de conocimiento (Azure AI Search tiene un límite de ~100 consultas/día en el plan gratuito). 
-
-Puedes:
-1. Intentar nuevamente en unas horas o mañana
-2. Descargar mi CV directamente desde el botón de descarga
-3. Preguntarme sobre otras funciones del asistente (OCR de imágenes, preguntas generales)
-
-¡Gracias por tu comprensión!"
-
-Para cualquier otra pregunta que no sea sobre información personal de Federico, puedes responder normalmente."""
-            messages.append({"role": "system", "content": fallback_message})
+            messages.append({"role": "system", "content": self.FALLBACK_MESSAGE})
         
         # Agregar historial (limitado)
         if history:
@@ -101,13 +137,70 @@ Para cualquier otra pregunta que no sea sobre información personal de Federico,
         
         return messages
     
+    def _build_stable_messages(
+        self,
+        user_message: str,
+        history: List[Dict],
+        knowledge_context: Optional[str] = None,
+        static_context: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Construye los mensajes con un prefijo identico entre requests.
+        
+        El primer mensaje (SYSTEM_PROMPT + contexto generico estable) no
+        cambia entre requests, asi el proveedor puede reutilizar su cache
+        de prompt. Las partes variables (historial, contexto especifico de
+        la pregunta, fallback y mensaje del usuario) van al final.
+        """
+        system_content = self.SYSTEM_PROMPT
+        if static_context:
+            system_content += "\n\n" + self.KB_TEMPLATE.format(context=static_context)
+        
+        messages = [{"role": "system", "content": system_content}]
+        
+        if history:
+            messages.extend(history[-self.MAX_HISTORY_MESSAGES:])
+        
+        if knowledge_context and knowledge_context != static_context:
+            kb_message = self.KB_TEMPLATE.format(context=knowledge_context)
+            messages.append({"role": "system", "content": kb_message})
+            logger.success(f"Contexto RAG inyectado al final: {len(knowledge_context)} chars")
+        elif not knowledge_context and not static_context:
+            logger.warn("Sin contexto RAG - límite de consultas posiblemente excedido")
+            messages.append({"role": "system", "content": self.FALLBACK_MESSAGE})
+        
+        messages.append({"role": "user", "content": user_message})
+        
+        logger.info(f"Prefijo estable: {len(system_content)} chars")
+        
+        return messages
+    
+    def _log_usage(self, result: dict):
+        """Loguea el consumo de tokens (incluidos los servidos desde cache)"""
+        usage = result.get('usage') or {}
+        self.last_usage = usage
+        
+        if not usage:
+            return
+        
+        details = usage.get('prompt_tokens_details') or {}
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        cached_tokens = details.get('cached_tokens', 0)
+        
+        logger.info(
+            f"Tokens: prompt={prompt_tokens} (cache={cached_tokens}), "
+            f"respuesta={usage.get('completion_tokens', 0)}"
+        )
+    
     def chat(
         self,
         message: str,
         history: List[Dict] = None,
         knowledge_context: str = None,
+        static_context: str = None,
         max_tokens: int = None,
-        temperature: float = None
+        temperature: float = None,
+        deadline: Deadline = None
     ) -> str:
         """
         Envia un mensaje a GPT y obtiene respuesta.
@@ -116,8 +209,10 @@ Para cualquier otra pregunta que no sea sobre información personal de Federico,
             message: Mensaje del usuario
             history: Historial de conversacion
             knowledge_context: Contexto de la base de conocimiento (RAG)
+            static_context: Contexto generico estable (modo prefijo estable)
             max_tokens: Maximo de tokens en respuesta
             temperature: Temperatura de generacion
+            deadline: Limite de tiempo del request (opcional)
             
         Returns:
             Respuesta de GPT o mensaje de error
@@ -128,13 +223,14 @@ Para cualquier otra pregunta que no sea sobre información personal de Federico,
         history = history or []
         max_tokens = max_tokens or self.DEFAULT_MAX_TOKENS
         temperature = temperature or self.DEFAULT_TEMPERATURE
+        deadline = deadline or Deadline(settings.deadline.request_seconds)
         
         try:
             logger.section("LLAMADA A GPT")
             logger.info(f"URL: {self.config.chat_url}")
             
             # Construir mensajes
-            messages = self._build_messages(message, history, knowledge_context)
+            messages = self._build_messages(message, history, knowledge_context, static_context)
             logger.info(f"Total mensajes en contexto: {len(messages)}")
             
             # Payload
@@ -145,23 +241,24 @@ Para cualquier otra pregunta que no sea sobre información personal de Federico,
             }
             
             # Llamada a la API
-            response = requests.post(
+            response = self.session.post(
                 self.config.chat_url,
                 headers=self._get_headers(),
                 json=payload,
-                timeout=self.DEFAULT_TIMEOUT
+                timeout=deadline.timeout(self.DEFAULT_TIMEOUT)
             )
             response.raise_for_status()
             
             # Extraer respuesta
             result = response.json()
+            self._log_usage(result)
             reply = result['choices'][0]['message']['content']
             
             logger.success(f"GPT respondio: {reply[:150]}...")
             
             return reply
             
-        except requests.exceptions.Timeout:
+        except (requests.exceptions.Timeout, DeadlineExceeded):
             logger.error("Timeout en llamada a GPT")
             return "Error: La solicitud tomo demasiado tiempo"
         except requests.exceptions.RequestException as e:
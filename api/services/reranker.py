@@ -0,0 +1,138 @@
+"""
+Reranking local de resultados de busqueda.
+Elimina chunks casi duplicados, limita los chunks por documento y
+reordena con boosts por campo antes de armar el contexto para GPT.
+"""
+import re
+import unicodedata
+from typing import FrozenSet, List, Set, Tuple
+
+from ..config import settings
+from ..utils import logger
+from .document_store import DocumentStore
+
+
+class Reranker:
+    """Reranker ligero (sin llamadas externas) para los resultados de Azure Search"""
+
+    # Palabras ignoradas al comparar la consulta con los campos
+    STOPWORDS = frozenset({
+        'que', 'cual', 'cuales', 'como', 'donde', 'cuando', 'tiene', 'tienes',
+        'del', 'las', 'los', 'una', 'uno', 'unos', 'unas', 'para', 'por',
+        'con', 'sin', 'sobre', 'este', 'esta', 'esto', 'hay', 'sus', 'federico', 'zoppi'
+    })
+
+    # Tamaño de los shingles (palabras) para detectar casi duplicados
+    SHINGLE_SIZE = 3
+
+    def __init__(self):
+        self.config = settings.rerank
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Minusculas y sin acentos"""
+        text = unicodedata.normalize('NFKD', text.lower())
+        return ''.join(c for c in text if not unicodedata.combining(c))
+
+    def _terms(self, text: str) -> Set[str]:
+        """Terminos significativos de un texto"""
+        words = re.findall(r'\w+', self._normalize(text))
+        return {w for w in words if len(w) > 2 and w not in self.STOPWORDS}
+
+    def _shingles(self, text: str) -> FrozenSet[str]:
+        """Conjunto de shingles de palabras de un chunk"""
+        words = re.findall(r'\w+', self._normalize(text))
+        if len(words) < self.SHINGLE_SIZE:
+            return frozenset([' '.join(words)])
+        return frozenset(
+            ' '.join(words[i:i + self.SHINGLE_SIZE])
+            for i in range(len(words) - self.SHINGLE_SIZE + 1)
+        )
+
+    @staticmethod
+    def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    def _field_match(self, query_terms: Set[str], values) -> float:
+        """Fraccion de terminos de la consulta presentes en un campo"""
+        if not query_terms or not values:
+            return 0.0
+        if isinstance(values, str):
+            values = [values]
+        field_terms = self._terms(' '.join(values))
+        return len(query_terms & field_terms) / len(query_terms)
+
+    def _score(self, query_terms: Set[str], result: dict) -> float:
+        """Score de Azure Search con boosts por keyPhrases, organizations y title"""
+        base = result.get('@search.score', 1.0)
+        boost = (
+            1.0
+            + self.config.key_phrases_boost * self._field_match(query_terms, result.get('keyPhrases'))
+            + self.config.organizations_boost * self._field_match(query_terms, result.get('organizations'))
+            + self.config.title_boost * self._field_match(query_terms, result.get('title'))
+        )
+        return base * boost
+
+    def rerank(self, query: str, results: List[dict]) -> List[Tuple[int, dict]]:
+        """
+        Reordena y filtra los resultados de busqueda.
+
+        Args:
+            query: Consulta del usuario
+            results: Documentos devueltos por Azure Search
+
+        Returns:
+            Pares (posicion original 1-based, documento) seleccionados,
+            del mas al menos relevante
+        """
+        if not results:
+            return []
+
+        query_terms = self._terms(query)
+        scored = sorted(
+            (
+                (self._score(query_terms, result), position, result)
+                for position, result in enumerate(results, 1)
+            ),
+            key=lambda item: item[0],
+            reverse=True
+        )
+        cutoff = scored[0][0] * self.config.score_threshold
+
+        selected: List[Tuple[int, dict]] = []
+        kept_shingles: List[FrozenSet[str]] = []
+        per_title = {}
+
+        for score, position, result in scored:
+            title = result.get('title')
+            chunk = result.get('chunk') or ''
+
+            if len(chunk) <= DocumentStore.MIN_CONTENT_CHARS:
+                continue
+
+            if score < cutoff:
+                logger.debug(f"   Rerank: '{title}' descartado (score {score:.2f} < {cutoff:.2f})")
+                continue
+
+            if title is not None and per_title.get(title, 0) >= self.config.max_chunks_per_title:
+                logger.debug(f"   Rerank: '{title}' descartado (max chunks por documento)")
+                continue
+
+            shingles = self._shingles(chunk)
+            if any(self._jaccard(shingles, kept) >= self.config.similarity_threshold for kept in kept_shingles):
+                logger.debug(f"   Rerank: '{title}' descartado (casi duplicado)")
+                continue
+
+            selected.append((position, result))
+            kept_shingles.append(shingles)
+            if title is not None:
+                per_title[title] = per_title.get(title, 0) + 1
+
+        logger.info(f"Rerank: {len(selected)} de {len(results)} documentos seleccionados")
+        return selected
+
+
+# Instancia singleton del servicio
+reranker = Reranker()
@@ -2,12 +2,16 @@
 Servicio de busqueda usando Azure AI Search.
 Implementa RAG (Retrieval Augmented Generation) para buscar en la base de conocimiento.
 """
-from typing import Optional, List
+import threading
+import time
+from typing import Optional, List, Tuple
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents import SearchClient
 
 from ..config import settings
-from ..utils import logger
+from ..utils import logger, Deadline, DeadlineExceeded, LatencyTracker, hedged_call
+from .document_store import DocumentStore, FormattedDocument
+from .reranker import reranker
 
 
 class SearchService:
@@ -23,9 +27,31 @@ class SearchService:
     # Campos de busqueda para consultas especificas
     SEARCH_FIELDS = ['chunk', 'title', 'keyPhrases', 'persons', 'organizations']
     
+    # Separadores del contexto final
+    CONTEXT_HEADER = "\n\n" + "=" * 60
+    CONTEXT_SEPARATOR = "\n\n"
+    
+    # Timeout de la peticion de warm-up (igual que Vision y OpenAI)
+    WARM_UP_TIMEOUT = 5
+    
+    # Segundos entre reintentos si no se pudo construir el contexto estatico
+    STATIC_CONTEXT_RETRY = 300
+    # Minimo de tokens que Azure OpenAI necesita para cachear un prefijo
+    PROMPT_CACHE_MIN_TOKENS = 1024
+    
     def __init__(self):
         self.config = settings.search
         self._client: Optional[SearchClient] = None
+        self.store = DocumentStore(ttl=self.config.document_cache_ttl)
+        # Contexto generico congelado para el prefijo estable del prompt
+        self._static_context: Optional[str] = None
+        self._static_ids: frozenset = frozenset()
+        self._static_attempt: Optional[float] = None
+        self._static_lock = threading.Lock()
+        self._latency = LatencyTracker(
+            default=settings.deadline.hedge_default_delay,
+            minimum=settings.deadline.hedge_min_delay
+        )
     
     @property
     def client(self) -> Optional[SearchClient]:
@@ -44,7 +70,93 @@ class SearchService:
         
         return self._client
     
-    def _is_generic_query(self, query: str) -> bool:
+    def warm_up(self, prefetch_generic: bool = False):
+        """
+        Abre la conexion con Azure Search antes de recibir trafico.
+        
+        Args:
+            prefetch_generic: Construye tambien el contexto estatico y
+                llena el almacen de documentos (gasta una consulta de la
+                cuota de Azure Search)
+        """
+        if not self.client:
+            return
+        
+        try:
+            # Peticion barata ($count) que abre la conexion TLS del cliente
+            count = self.client.get_document_count(
+                timeout=self.WARM_UP_TIMEOUT,
+                connection_timeout=self.WARM_UP_TIMEOUT,
+                read_timeout=self.WARM_UP_TIMEOUT
+            )
+            logger.success(f"Search Service listo ({count} documentos en el indice)")
+        except Exception as e:
+            logger.warn(f"Warm-up de Search fallido: {str(e)}")
+        
+        if prefetch_generic:
+            self.get_static_context()
+    
+    def get_static_context(self, deadline: Optional[Deadline] = None) -> str:
+        """
+        Contexto generico estable para el prefijo del prompt.
+        
+        Se construye una sola vez (primer uso o warm-up) y queda congelado:
+        las busquedas posteriores no lo modifican. Si falla se reintenta
+        como mucho cada STATIC_CONTEXT_RETRY segundos para no gastar cuota.
+        """
+        if self._static_context is not None:
+            return self._static_context
+        
+        if not self.config.is_configured or not self.client:
+            return ""
+        
+        with self._static_lock:
+            retry_due = (
+                self._static_attempt is None
+                or time.monotonic() - self._static_attempt >= self.STATIC_CONTEXT_RETRY
+            )
+            if self._static_context is None and retry_due:
+                self._static_attempt = time.monotonic()
+                context, ids = self._build_static_context(deadline or Deadline(settings.deadline.request_seconds))
+                if context:
+                    self._static_ids = ids
+                    self._static_context = context
+        
+        return self._static_context or ""
+    
+    def _build_static_context(self, deadline: Deadline) -> Tuple[str, frozenset]:
+        """
+        Ejecuta la consulta generica y arma un contexto determinista.
+        
+        Returns:
+            Contexto y los IDs de los documentos que contiene
+        """
+        try:
+            results = self._execute(self._build_search_params('*', True), deadline)
+        except Exception as e:
+            logger.error(f"Error construyendo contexto estatico: {str(e)}")
+            return "", frozenset()
+        
+        ranked = reranker.rerank("", results) if settings.rerank.enabled else list(enumerate(results, 1))
+        
+        # Orden fijo (no el de Azure) para que sea igual en todas las instancias
+        ranked.sort(key=lambda item: (str(item[1].get('title', '')), item[1].get('chunk', '')))
+        
+        parts = [doc for doc in (self.store.get(result, index) for index, result in ranked) if doc]
+        if not parts:
+            logger.warn("Contexto estatico vacio")
+            return "", frozenset()
+        
+        context = self.CONTEXT_HEADER + self.store.join(parts, self.CONTEXT_SEPARATOR)
+        
+        approx_tokens = len(context) // 4
+        logger.success(f"Contexto estatico congelado: {len(context)} chars (~{approx_tokens} tokens)")
+        if approx_tokens < self.PROMPT_CACHE_MIN_TOKENS:
+            logger.warn(f"Prefijo por debajo de {self.PROMPT_CACHE_MIN_TOKENS} tokens: Azure no lo cacheara")
+        
+        return context, frozenset(doc.doc_id for doc in parts if doc.doc_id)
+    
+    def is_generic_query(self, query: str) -> bool:
         """Determina si la consulta es generica (debe traer todos los docs)"""
         query_lower = query.lower()
         return any(kw in query_lower for kw in self.GENERIC_KEYWORDS)
@@ -66,34 +178,22 @@ class SearchService:
             'include_total_count': True
         }
     
-    def _format_document(self, result: dict, index: int) -> Optional[str]:
-        """Formatea un documento para incluir en el contexto"""
-        content = result.get('chunk', '')
-        
-        if not content or len(content) <= 20:
-            return None
-        
-        title = result.get('title', f'doc_{index}')
-        persons = result.get('persons', [])
-        organizations = result.get('organizations', [])
-        locations = result.get('locations', [])
-        key_phrases = result.get('keyPhrases', [])
-        
-        # Construir documento enriquecido
-        formatted = f"[DOC: {title}]\n\n"
-        
-        if persons:
-            formatted += f"Personas: {', '.join(persons)}\n"
-        if organizations:
-            formatted += f"Organizaciones: {', '.join(organizations)}\n"
-        if locations:
-            formatted += f"Ubicaciones: {', '.join(locations)}\n"
-        if key_phrases:
-            formatted += f"Palabras clave: {', '.join(key_phrases[:7])}\n"
-        
-        formatted += f"\n{content[:1200]}"
-        
-        return formatted
+    def _execute(self, search_params: dict, deadline: Deadline) -> List[dict]:
+        """Ejecuta la busqueda dentro del tiempo restante (hedged si esta habilitado)"""
+        def run() -> List[dict]:
+            # `timeout` solo limita la RetryPolicy: conexion y lectura van aparte
+            remaining = deadline.timeout()
+            # Materializar el iterador para que la llamada HTTP ocurra aqui
+            return list(self.client.search(
+                **search_params,
+                timeout=remaining,
+                connection_timeout=remaining,
+                read_timeout=remaining
+            ))
+        
+        if settings.deadline.hedge_search:
+            return hedged_call(run, self._latency, deadline)
+        return run()
     
     def _log_document(self, result: dict, index: int):
         """Loguea informacion de un documento"""
@@ -103,12 +203,20 @@ class SearchService:
         logger.info(f"   Score: {result.get('@search.score', 0)}")
         logger.info(f"   Contenido: {len(result.get('chunk', ''))} chars")
     
-    def search(self, query: str) -> str:
+    def search(
+        self,
+        query: str,
+        deadline: Optional[Deadline] = None,
+        exclude_static: bool = False
+    ) -> str:
         """
         Busca en la base de conocimiento y retorna contexto relevante.
         
         Args:
             query: Consulta del usuario
+            deadline: Limite de tiempo del request (opcional)
+            exclude_static: Omite los documentos que ya estan en el
+                contexto estatico (modo prefijo estable)
             
         Returns:
             Contexto formateado para RAG o string vacio si no hay resultados
@@ -121,6 +229,8 @@ class SearchService:
             logger.error("No se pudo crear cliente de busqueda")
             return ""
         
+        deadline = deadline or Deadline(settings.deadline.request_seconds)
+        
         try:
             logger.section("BUSQUEDA EN BASE DE CONOCIMIENTO")
             logger.info(f"Endpoint: {self.config.endpoint}")
@@ -128,39 +238,53 @@ class SearchService:
             logger.info(f"Query: '{query[:200]}...'")
             
             # Determinar tipo de busqueda
-            is_generic = self._is_generic_query(query)
+            is_generic = self.is_generic_query(query)
             logger.info(f"Tipo: {'GENERICA' if is_generic else 'ESPECIFICA'}")
             
             # Ejecutar busqueda
             search_params = self._build_search_params(query, is_generic)
-            results = self.client.search(**search_params)
+            results = self._execute(search_params, deadline)
             
             # Procesar resultados
-            context_parts: List[str] = []
-            result_count = 0
+            context_parts: List[FormattedDocument] = []
+            result_count = len(results)
+            
+            for index, result in enumerate(results, 1):
+                self._log_document(result, index)
             
-            for result in results:
-                result_count += 1
-                self._log_document(result, result_count)
-                
-                formatted = self._format_document(result, result_count)
-                if formatted:
+            # Deduplicar y reordenar antes de armar el contexto
+            # (las genericas sin boosts: su contexto debe ser estable entre requests)
+            if settings.rerank.enabled:
+                ranked = reranker.rerank("" if is_generic else query, results)
+            else:
+                ranked = list(enumerate(results, 1))
+            
+            # `index` es la posicion original, la misma que en los logs de arriba
+            for index, result in ranked:
+                formatted = self.store.get(result, index)
+                if formatted and exclude_static and formatted.doc_id in self._static_ids:
+                    logger.info(f"   Documento {index} omitido (ya esta en el contexto estatico)")
+                elif formatted:
                     context_parts.append(formatted)
-                    logger.success(f"   Documento {result_count} agregado al contexto")
+                    logger.success(f"   Documento {index} ({result.get('title', 'N/A')}) agregado al contexto")
                 else:
-                    logger.warn(f"   Documento {result_count} descartado (contenido insuficiente)")
+                    logger.warn(f"   Documento {index} descartado (contenido insuficiente)")
             
             # Resumen
             logger.info(f"\nRESUMEN: {result_count} docs procesados, {len(context_parts)} incluidos")
+            logger.debug(f"Documentos preformateados en cache: {len(self.store)}")
             
             if context_parts:
-                final_context = "\n\n" + "=" * 60 + "\n\n".join(context_parts)
+                final_context = self.CONTEXT_HEADER + self.store.join(context_parts, self.CONTEXT_SEPARATOR)
                 logger.success(f"Contexto final: {len(final_context)} caracteres")
                 return final_context
             
             logger.warn("Sin contexto para devolver")
             return ""
             
+        except DeadlineExceeded:
+            logger.warn("Busqueda cancelada: deadline del request agotado")
+            return ""
         except Exception as e:
             logger.error(f"Error en busqueda: {str(e)}")
             import traceback
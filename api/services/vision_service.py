@@ -8,15 +8,49 @@ import requests
 from typing import Optional
 
 from ..config import settings
-from ..utils import logger
+from ..utils import logger, Deadline, DeadlineExceeded, LatencyTracker, hedged_call
 
 
 class VisionService:
     """Servicio para procesamiento de imagenes con Azure Computer Vision"""
     
+    # Timeouts maximos (se recortan al tiempo restante del request)
+    ANALYZE_TIMEOUT = 30
+    POLL_TIMEOUT = 10
+    POLL_INTERVAL = 1
+    WARM_UP_TIMEOUT = 5
+    
     def __init__(self):
         self.config = settings.vision
         self.api_version = "v3.2"
+        self._session: Optional[requests.Session] = None
+        self._poll_latency = LatencyTracker(
+            default=settings.deadline.hedge_default_delay,
+            minimum=settings.deadline.hedge_min_delay
+        )
+    
+    @property
+    def session(self) -> requests.Session:
+        """Sesion HTTP reutilizable (mantiene las conexiones abiertas)"""
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+    
+    def warm_up(self):
+        """
+        Abre la conexion TLS del pool antes de recibir trafico.
+        
+        Un HEAD sin credenciales basta: la respuesta (401/404) no importa,
+        la conexion queda abierta en la sesion para el primer request real.
+        """
+        if not self.config.is_configured:
+            return
+        
+        try:
+            self.session.head(self.analyze_url, timeout=self.WARM_UP_TIMEOUT)
+            logger.success("Vision Service listo (conexion abierta)")
+        except requests.exceptions.RequestException as e:
+            logger.warn(f"Warm-up de Vision fallido: {str(e)}")
     
     @property
     def analyze_url(self) -> str:
@@ -37,16 +71,28 @@ class VisionService:
             return base64.b64decode(image_base64.split(',')[1])
         return base64.b64decode(image_base64)
     
-    def _poll_result(self, operation_url: str, max_attempts: int = 15) -> Optional[dict]:
-        """Espera y obtiene el resultado de la operacion asincrona"""
+    def _fetch_status(self, operation_url: str, deadline: Deadline) -> dict:
+        """Consulta una vez el estado de la operacion (hedged si esta habilitado)"""
         headers = {'Ocp-Apim-Subscription-Key': self.config.key}
         
+        def fetch() -> dict:
+            response = self.session.get(
+                operation_url,
+                headers=headers,
+                timeout=deadline.timeout(self.POLL_TIMEOUT)
+            )
+            return response.json()
+        
+        if settings.deadline.hedge_ocr_poll:
+            return hedged_call(fetch, self._poll_latency, deadline)
+        return fetch()
+    
+    def _poll_result(self, operation_url: str, deadline: Deadline, max_attempts: int = 15) -> Optional[dict]:
+        """Espera y obtiene el resultado de la operacion asincrona"""
         for attempt in range(max_attempts):
-            time.sleep(1)
-            
             try:
-                response = requests.get(operation_url, headers=headers, timeout=10)
-                result = response.json()
+                time.sleep(deadline.timeout(self.POLL_INTERVAL))
+                result = self._fetch_status(operation_url, deadline)
                 
                 status = result.get('status')
                 
@@ -55,7 +101,10 @@ class VisionService:
                 elif status == 'failed':
                     logger.error(f"OCR fallo en intento {attempt + 1}")
                     return None
-                    
+            
+            except DeadlineExceeded:
+                logger.warn(f"OCR sin tiempo restante tras {attempt + 1} intentos")
+                return None
             except Exception as e:
                 logger.error(f"Error polling OCR: {str(e)}")
         
@@ -72,12 +121,13 @@ class VisionService:
         
         return '\n'.join(lines)
     
-    def extract_text(self, image_base64: str) -> Optional[str]:
+    def extract_text(self, image_base64: str, deadline: Optional[Deadline] = None) -> Optional[str]:
         """
         Extrae texto de una imagen usando OCR.
         
         Args:
             image_base64: Imagen codificada en base64
+            deadline: Limite de tiempo del request (opcional)
             
         Returns:
             Texto extraido o None si falla
@@ -86,6 +136,8 @@ class VisionService:
             logger.error("Vision Service no configurado")
             return None
         
+        deadline = deadline or Deadline(settings.deadline.request_seconds)
+        
         try:
             logger.info("Procesando imagen con OCR...")
             
@@ -93,11 +145,11 @@ class VisionService:
             image_data = self._decode_image(image_base64)
             
             # Enviar a Azure
-            response = requests.post(
+            response = self.session.post(
                 self.analyze_url,
                 headers=self._get_headers(),
                 data=image_data,
-                timeout=30
+                timeout=deadline.timeout(self.ANALYZE_TIMEOUT)
             )
             response.raise_for_status()
             
@@ -109,7 +161,7 @@ class VisionService:
                 return None
             
             # Esperar resultado
-            result = self._poll_result(operation_url)
+            result = self._poll_result(operation_url, deadline)
             
             if not result:
                 return None
@@ -124,6 +176,9 @@ class VisionService:
             
             return text if text else None
             
+        except DeadlineExceeded:
+            logger.warn("OCR cancelado: deadline del request agotado")
+            return None
         except requests.exceptions.RequestException as e:
             logger.error(f"Error de red en OCR: {str(e)}")
             return None
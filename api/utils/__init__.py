@@ -1,3 +1,4 @@
 from .logger import logger, Logger
+from .deadline import Deadline, DeadlineExceeded, LatencyTracker, hedged_call
 
-__all__ = ['logger', 'Logger']
+__all__ = ['logger', 'Logger', 'Deadline', 'DeadlineExceeded', 'LatencyTracker', 'hedged_call']
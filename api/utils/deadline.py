@@ -0,0 +1,132 @@
+"""
+Deadline por request y llamadas "hedged".
+Permite repartir el tiempo restante de un request entre los servicios
+y lanzar una segunda peticion cuando la primera tarda mas de lo normal.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+
+class DeadlineExceeded(TimeoutError):
+    """El request ya no tiene tiempo disponible"""
+
+
+class Deadline:
+    """Instante limite de un request"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @property
+    def remaining(self) -> float:
+        """Segundos que quedan (puede ser negativo)"""
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+    def reserve(self, seconds: float) -> 'Deadline':
+        """
+        Deadline hijo que vence `seconds` antes que este.
+        
+        Sirve para que una etapa no consuma el tiempo que necesitan
+        las etapas siguientes.
+        """
+        return Deadline(self.remaining - seconds)
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout para la siguiente llamada: el menor entre `cap` y lo que queda.
+
+        Raises:
+            DeadlineExceeded: si ya no queda tiempo
+        """
+        remaining = self.remaining
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline de {self.seconds}s agotado")
+        return remaining if cap is None else min(cap, remaining)
+
+
+class LatencyTracker:
+    """Ventana de latencias recientes para estimar el p95 de una llamada"""
+
+    def __init__(self, default: float, minimum: float, window: int = 100):
+        self.default = default
+        self.minimum = minimum
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float:
+        """p95 observado (o el valor por defecto si aun hay pocas muestras)"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < 20:
+            return self.default
+        return max(self.minimum, samples[int(len(samples) * 0.95) - 1])
+
+
+# Threads para los intentos hedged. Cada request concurrente usa hasta 2
+# (intento + hedge) y el threadpool de Starlette/anyio admite 40 a la vez,
+# asi que los intentos nunca esperan en cola. Los threads se crean bajo demanda.
+MAX_HEDGE_WORKERS = 80
+
+_executor = ThreadPoolExecutor(max_workers=MAX_HEDGE_WORKERS, thread_name_prefix="hedge")
+
+
+def hedged_call(
+    fn: Callable[[], T],
+    tracker: LatencyTracker,
+    deadline: Optional[Deadline] = None
+) -> T:
+    """
+    Ejecuta `fn` y, si no responde antes del p95, lanza una segunda copia.
+
+    Devuelve la primera respuesta exitosa. Si ambas fallan se relanza
+    la excepcion de la ultima en terminar.
+    """
+    hedge_delay = tracker.p95()
+    if deadline is not None:
+        hedge_delay = min(hedge_delay, deadline.timeout())
+
+    def submit() -> Future:
+        # Se registra la latencia de cada intento exitoso, tambien del que
+        # pierde: si no, el p95 queda sesgado a la baja y se hedgea de mas
+        sent_at = time.monotonic()
+
+        def record(future: Future):
+            if not future.cancelled() and future.exception() is None:
+                tracker.record(time.monotonic() - sent_at)
+
+        future = _executor.submit(fn)
+        future.add_done_callback(record)
+        return future
+
+    done, pending = wait({submit()}, timeout=hedge_delay)
+
+    if not done:
+        pending.add(submit())
+
+    error: Optional[BaseException] = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        timeout = deadline.timeout() if deadline is not None else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded("Deadline agotado esperando respuesta hedged")